@@ -1,17 +1,32 @@
 """Linear colormaps."""
 
-from utils import clamp, lin_interp
+import numpy as np
 
 class ColorMap:
     """Basic linear colormaps."""
 
+    __slots__ = ('start', 'end', '_s', '_e', '_d')
+
     def __init__(self, start, end):
         """Creates a new ColorMap.
         - start: Start color
         - end: End color
         Colors are 8-bit RGB colors, so (r, g, b) tuples of integers in [0, 255]."""
         self.start, self.end = start, end
-        self.start, self.end = start, end
+        self._s = np.asarray(start, dtype=np.float64)
+        self._e = np.asarray(end,   dtype=np.float64)
+        self._d = self._e - self._s
+
+    def __getstate__(self):
+        """Pickles the colormap as its start and end colors only."""
+        return {'start': self.start, 'end': self.end}
+
+    def __setstate__(self, state):
+        """Restores an unpickled colormap.
+        States pickled by previous versions, with more attributes, are accepted."""
+        if isinstance(state, tuple): # (dict, slots) state
+            state = state[1]
+        self.__init__(state['start'], state['end'])
 
     def __call__(self, x, start=0, end=1, max_out=255):
         """Will map a value to a color.
@@ -19,7 +34,15 @@ class ColorMap:
         - start: Value that will be mapped to the ColorMap start color
         - end: Value that will be mapped to the ColorMap end color
         - max_out: 255 for 8 bit color, 1 for float color"""
-        return tuple([clamp(lin_interp(x, start, end, self.start[i], self.end[i]) / 255 * max_out, 0, max_out) for i in range(3)])
+        t = (x - start) / (end - start)
+        return tuple((np.clip(self._s + t * self._d, 0, 255) * (max_out / 255)).tolist())
+
+    def map_many(self, xs, start=0, end=1, max_out=255):
+        """Will map a sequence of values to an (M, 3) array of colors.
+        Arguments are the same as when calling the ColorMap."""
+        inv = 1.0 / (end - start) # Hoisted so each value costs a product, not a division
+        t = ((np.asarray(xs) - start) * inv)[:, None]
+        return np.clip(self._s + t * self._d, 0, 255) * (max_out / 255)
 
 
 black           = ColorMap((000, 000, 000), (000, 000, 000))
@@ -1,20 +1,24 @@
 """Various and generic stuff."""
 
-from inspect import getsource
-from math    import log, e
-from random  import shuffle
-from copy    import copy
+from inspect  import getsource
+from textwrap import dedent
+from math     import log, e
+from random   import sample
+import numpy as np
+import ast
 import re
 
-def shuffled(seq, *args, **kwargs):
-    """Returns a shuffled copy of the sequence seq."""
-    seq = copy(seq)
-    shuffle(seq, *args, **kwargs)
-    return seq
+_LAMBDA_PATTERN = re.compile(r"lambda.*?:\s?(.*?)[\]\n\,]")
+
+def shuffled(seq):
+    """Returns a shuffled copy of the sequence seq, as a list."""
+    return sample(seq, len(seq))
 
 def clamp(x, inf=0, sup=1):
     """Clamps x in the range [inf, sup]."""
-    return inf if x < inf else sup if x > sup else x
+    return min(sup, max(inf, x))
+
+clamp_arr = np.clip # Clamps whole arrays, for bulk callers
 
 def replace_patterns(string, patterns):
     """Replaces multiple patterns in a string.
@@ -37,11 +41,17 @@ def log_interp(x, x_min=0, x_max=1, y_min=0, y_max=1):
 
 def rev_enumerate(iterable):
     """Enumerates an iterable object in reverse. Original indexes are preserved."""
-    for i in reversed(range(len(iterable))):
-        yield i, iterable[i]
+    return zip(range(len(iterable) - 1, -1, -1), reversed(iterable))
 
 def approxIndex(iterable, item, threshold):
     """Same as the python index() function but with a threshold from wich values are considerated equal."""
+    try:
+        arr = np.asarray(iterable)
+        if arr.ndim == 1 and np.ndim(item) == 0: # Sequences of scalars only
+            hits = np.nonzero(np.abs(arr - item) < threshold)[0]
+            return int(hits[-1]) if hits.size else None
+    except (TypeError, ValueError): # Non numeric or ragged items, compared one by one
+        pass
     for i, iterableItem in rev_enumerate(iterable):
         if abs(iterableItem - item) < threshold:
             return i
@@ -53,10 +63,14 @@ def is_sequence(item):
 
 def get_lambda_code(lmbd, n=0):
     """Dirty way to get the code of a lambda function."""
-    lmbd = getsource(lmbd)
-    pat = r"lambda.*?:\s?(.*?)[\]\n\,]"
-    matches = re.findall(pat, lmbd)
-    return matches[n]
+    source = dedent(getsource(lmbd))
+    try:
+        tree = ast.parse(source)
+    except SyntaxError: # Source lines are only a fragment of a statement
+        return _LAMBDA_PATTERN.findall(source)[n]
+    lambdas = sorted((node for node in ast.walk(tree) if isinstance(node, ast.Lambda)),
+        key=lambda node: (node.lineno, node.col_offset))
+    return ast.get_source_segment(source, lambdas[n].body)
 
 if __name__ == '__main__':
     import matplotlib.pyplot as plt
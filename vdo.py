@@ -2,15 +2,41 @@
 
 import cv2
 import os
+from collections        import deque
+from concurrent.futures import ThreadPoolExecutor
 
-def assemble(images_paths, output='video.mp4', factor=1, show=False):
-    """Builds video from image files."""
-    out = None
-    for image_path in images_paths:
-        print("Reading %s" % image_path)
-        frame = cv2.imread(image_path)
+def read_frame(image_path, factor=1):
+    """Reads and resizes an image file."""
+    frame = cv2.imread(image_path)
+    if factor != 1:
         frame = cv2.resize(frame, None, fx=1/factor, fy=1/factor, interpolation=cv2.INTER_AREA)
+    return frame
+
+def read_frames(images_paths, factor=1, ahead=4):
+    """Yields frames read from image files.
+    Up to ahead frames are read in background threads while the current one is used.
+    If ahead is 0, frames are read one by one when needed."""
+    if ahead < 1:
+        for image_path in images_paths:
+            print("Reading %s" % image_path)
+            yield read_frame(image_path, factor)
+        return
 
+    with ThreadPoolExecutor(max_workers=ahead) as executor:
+        futures = deque()
+        for image_path in images_paths:
+            print("Reading %s" % image_path) # From this thread, so lines don't interleave
+            futures.append(executor.submit(read_frame, image_path, factor))
+            if len(futures) > ahead:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+def assemble(images_paths, output='video.mp4', factor=1, show=False, ahead=4):
+    """Builds video from image files.
+    - ahead: Number of frames read in advance while encoding."""
+    out = None
+    for frame in read_frames(images_paths, factor, ahead):
         if out is None:
             # Defines video shape from first frame
             height, width, channels = frame.shape
@@ -34,8 +60,9 @@ def assemble(images_paths, output='video.mp4', factor=1, show=False):
 
 def paths_from_extension(extension='png', dir='.'):
     """Returns all filenames matching the provided extension in dir."""
-    filenames = [f for f in os.listdir(dir) if f.endswith(ext)]
-    return tuple([os.path.join(dir, name) for name in filenames])
+    ext = '.' + extension.lower().lstrip('.')
+    with os.scandir(dir) as entries:
+        return tuple(e.path for e in entries if e.is_file() and e.name.lower().endswith(ext))
 
 
 if __name__ == '__main__':
@@ -45,7 +72,7 @@ if __name__ == '__main__':
     ap = argparse.ArgumentParser()
     ap.add_argument("-ext", "--extension", required=False, default='png',       help="extension name. default is 'png'.")
     ap.add_argument("-o",   "--output",    required=False, default='video.mp4', help="output video file")
-    ap.add_argument("-f",   "--factor",    required=False, default=1,           help="size reduction factor")
+    ap.add_argument("-f",   "--factor",    required=False, default=1,           help="size reduction factor", type=float)
     ap.add_argument("-s",   "--show",      required=False, default=0,           help="show video")
     args = vars(ap.parse_args())
 
@@ -2,19 +2,67 @@
 
 import os
 import pickle
+import numpy as np
 from colormaps import ColorMap, black
 from utils     import lin_interp, is_sequence, clamp
-from math      import sqrt
-from copy      import copy
+from math      import hypot
+
+try:
+    from numba import njit
+except ImportError: # numba is optional, numpy is used instead
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _step(P, W, out):
+        """Writes in out the positions following P, according to relations W."""
+        for i in range(P.shape[0]):
+            for k in range(3):
+                s = 0.0
+                for j in range(P.shape[0]):
+                    s += W[i, j] * (P[j, k] - P[i, k])
+                out[i, k] = P[i, k] + s
+else:
+    _step = None
 
 class Walker():
     """Class representating a walker object."""
 
+    __slots__ = ('start_position', '_position', '_system', '_i')
+
     def __init__(self, position=(0, 0, 0)):
         """Creates a new Walker.
         - position: (x, y, z)"""
         self.start_position = tuple(position)
-        self.position       = list(position)
+        self._position      = np.asarray(position, dtype=np.float64)
+        self._system, self._i = None, None
+
+    @property
+    def position(self):
+        """Current position. Once the walker belongs to a system,
+        this is a view on its row of the system positions array."""
+        if self._system is None:
+            return self._position
+        return self._system._P[self._i]
+
+    @position.setter
+    def position(self, position):
+        if self._system is None:
+            self._position = np.asarray(position, dtype=np.float64)
+        else:
+            self._system._P[self._i] = position
+
+    def __getstate__(self):
+        """Pickles the walker without its system, which rebinds it when rebuilt."""
+        return {'start_position': self.start_position, 'position': self.position.tolist()}
+
+    def __setstate__(self, state):
+        """Restores an unpickled walker.
+        States pickled by previous versions, with more attributes, are accepted."""
+        if isinstance(state, tuple): # (dict, slots) state
+            state = state[1]
+        self.__init__(state['_position'] if '_position' in state else state['position'])
+        self.start_position = tuple(state['start_position'])
 
     def __str__(self):
         """Simple informal string representation."""
@@ -25,12 +73,16 @@ class Walker():
         return "Walker %s" % id(self)
 
     def distance_from(self, other):
-        return sqrt(sum([(other.position[i] - self.position[i]) ** 2 for i in range(len(self.position))]))
+        a, b = self.position, other.position
+        return hypot(b[0] - a[0], b[1] - a[1], b[2] - a[2])
 
 
 class WalkingSystem:
     """Class representing a system of walkers walking to each other."""
 
+    __slots__ = ('walkers', 'iterations', 'cmap', '__curves', '__rings',
+        '_walkers_list', '_idx', '_P', '_W', '_W_rowsum', '_P_next')
+
     def __init__(self, walkers, iterations=100, cmap=black):
         """Creates a new system.
         - walkers: A dict describing Walkers and relations they have:
@@ -41,13 +93,63 @@ class WalkingSystem:
         }
         Positive value is attraction, and negative is repulsion.
         Omitting a key is permitted and is equivalent to a value of 0.
+        Walkers only appearing as related walkers are fixed anchors: they
+        attract or repulse others, but never move and aren't plotted.
         Values superior to 1 or inferior to -1 are likely to do funky things.
+        A walker belongs to the last system built from it, and its position is
+        then the one it has in this system.
         - iterations: The number of iterations on wich this system is defined.
         - cmap: ColorMap for plotting rings."""
         self.walkers    = walkers
         self.iterations = iterations
         self.cmap       = cmap
         self.curves, self.rings = None, None
+        self._build_arrays()
+        self._bind_walkers()
+
+    def _build_arrays(self):
+        """Builds the positions and relations arrays from the walkers dict."""
+        # Positions and relations are stored as arrays so a step is a matrix product,
+        # the relations dict is only walked once here. Anchors are indexed after
+        # the moving walkers, with no relations so they stay put.
+        self._walkers_list = list(self.walkers)
+        for relations in self.walkers.values():
+            self._walkers_list += [wlkr for wlkr in relations
+                if wlkr not in self.walkers and wlkr not in self._walkers_list]
+        N = len(self._walkers_list)
+        self._idx = {wlkr: i for i, wlkr in enumerate(self._walkers_list)}
+        self._P   = np.array([wlkr.position for wlkr in self._walkers_list],
+            dtype=np.float64).reshape(N, 3)
+        self._W   = np.zeros((N, N))
+        for i, relations in enumerate(self.walkers.values()):
+            self._W[i, [self._idx[wlkr] for wlkr in relations]] = list(relations.values())
+        self._W_rowsum = self._W.sum(axis=1, keepdims=True)
+        self._P_next   = np.empty_like(self._P) # Output buffer for the numba kernel
+
+    def __getstate__(self):
+        """Pickles the system without its vectrices data nor any array derived
+        from its walkers, to save disk space and forward compatibility."""
+        return {'walkers': self.walkers, 'iterations': self.iterations, 'cmap': self.cmap}
+
+    def __setstate__(self, state):
+        """Rebuilds an unpickled system from its walkers.
+        States pickled by previous versions, with more attributes, are accepted."""
+        if isinstance(state, tuple): # (dict, slots) state
+            state = state[1]
+        self.walkers    = state['walkers']
+        self.iterations = state['iterations']
+        self.cmap       = state['cmap']
+        self.curves, self.rings = None, None
+        self._build_arrays()
+        # Walkers shared with the original system of a shallow copy stay bound to it
+        self._bind_walkers(unbound_only=True)
+
+    def _bind_walkers(self, unbound_only=False):
+        """Makes walkers positions views on the system positions array.
+        - unbound_only: Only binds walkers not belonging to a system yet."""
+        for i, wlkr in enumerate(self._walkers_list):
+            if not unbound_only or wlkr._system is None:
+                wlkr._system, wlkr._i = self, i
 
     @property
     def curves(self):
@@ -81,11 +183,8 @@ class WalkingSystem:
         """Saves this WalkingSystem to filesystem."""
         if not name:
             name = repr(self) + '.pkl'
-        to_save = copy(self)
-        to_save.rings  = None # Don't save rings and curves vectrices data,
-        to_save.curves = None # to save disk space and forward compatibility
         with open(path + name, 'wb') as f:
-            pickle.dump(to_save, f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
         return
 
     @staticmethod
@@ -96,39 +195,48 @@ class WalkingSystem:
 
     def get_current_state(self):
         """Returns current system state."""
-        return tuple([wlkr.position for wlkr in self.walkers])
+        return tuple(self._P[:len(self.walkers)].tolist())
 
     def next_state(self):
         """Computes and returns the next system state."""
-        for wlkr, relations in self.walkers.items():
-            pos = wlkr.position
-            for related_wlkr, relation in relations.items():
-                for i in range(len(pos)):
-                    pos[i] += (related_wlkr.position[i] - pos[i]) * (relation)
-            wlkr.position = pos
+        self._advance()
         return self.get_current_state()
 
+    def _advance(self):
+        """Computes the next system state, without building it."""
+        if _step is not None:
+            _step(self._P, self._W, self._P_next)
+            self._P, self._P_next = self._P_next, self._P
+        else:
+            self._P += self._W @ self._P - self._W_rowsum * self._P
+
     def states(self):
-        """Return a generator yielding the states of the walkers."""
+        """Return a generator yielding the states of the walkers, as (N, 3) arrays."""
         for iteration in range(self.iterations):
-            yield self.get_current_state()
-            self.next_state()
-
-    def compute_3d_vectrices(self):
-        """Computes, stores and returns 3d vectrices data."""
-        curves = tuple([[[] for j in range(3)] for i in range(len(self.walkers))])
-        rings = []
+            yield self._P[:len(self.walkers)].copy()
+            self._advance()
 
-        for state in self.states():
-            ring = [[] for i in range(3)]
-            for i, position in enumerate(state):
-                for j, coord in enumerate(position):
-                    curves[i % len(self.walkers)][j % 3].append(coord)
-                    ring[j % 3].append(coord)
+    def run(self, iterations=None):
+        """Computes the states of the walkers into a single
+        (iterations, walkers, 3) array. The system is left in the state following them.
+        - iterations: Number of states to compute. If None, the system iterations."""
+        if iterations is None:
+            iterations = self.iterations
+        N = len(self.walkers)
+        traj = np.empty((iterations, N, 3))
+        for t in range(iterations):
+            traj[t] = self._P[:N] # Without anchors
+            self._advance()
+        return traj
 
-            for i in range(len(ring)): # Adds a segment at the end of each ring
-                ring[i].append(ring[i][0])
-            rings.append(ring)
+    def compute_3d_vectrices(self):
+        """Computes, stores and returns 3d vectrices data.
+        - curves: (walkers, 3, iterations) array of the walkers trajectories
+        - rings: (iterations, 3, walkers + 1) array of the closed rings joining walkers"""
+        traj   = self.run()
+        curves = traj.transpose(1, 2, 0)
+        # Adds a segment at the end of each ring, back to the first walker
+        rings  = np.concatenate((traj, traj[:, :1]), axis=1).transpose(0, 2, 1)
 
         self.curves = curves
         self.rings  = rings
@@ -164,6 +272,7 @@ class WalkingSystem:
             try:
                 import matplotlib.pyplot as plt
                 from mpl_toolkits.mplot3d import Axes3D
+                from mpl_toolkits.mplot3d.art3d import Line3DCollection
             except ImportError:
                 raise ImportError("pyplot must be installed in order to use it."
                 "Try to 'pip install matplotlib' in a command line.")
@@ -207,40 +316,54 @@ class WalkingSystem:
 
 
         rings  = self.rings[:iterations]
-        for i, ring in enumerate(rings):
-            color = self.cmap(i, 0, len(self.rings) / 2, 1)
-            if engine == 'visvis':
-                vv.plot(*ring, lc=color, mw=0, alpha=.2)
-            elif engine == 'pyplot':
-                ax.plot(*ring, c=color+(.4,)) # Adding alpha as (r, g, b, a)
-            else:
-                data.append(Scatter3d(
-                    x = ring[0],
-                    y = ring[1],
-                    z = ring[2],
+        curves = self.curves[:, :, :iterations]
+        R = len(rings)
+        cmap_end = len(self.rings) / 2
+        if hasattr(self.cmap, 'map_many'): # Colors lookup table, computed at once
+            colors = self.cmap.map_many(np.arange(R), 0, cmap_end, 1)
+        else:
+            colors = np.array([self.cmap(i, 0, cmap_end, 1) for i in range(R)]).reshape(-1, 3)
+
+        if engine == 'pyplot': # Rings and curves are each plotted as a single collection
+            if R:
+                colors = np.column_stack((colors, np.full(R, .4))) # Adding alpha as (r, g, b, a)
+                ax.add_collection3d(Line3DCollection(rings.transpose(0, 2, 1), colors=colors))
+                ax.add_collection3d(Line3DCollection(curves.transpose(0, 2, 1), colors=(0, 0, 0, .8)))
+                ax.auto_scale_xyz(*rings.transpose(1, 0, 2))
+
+        else:
+            lut = colors.tolist()
+            if engine == 'plotly': # 8-bit colors, converted once for all rings
+                lut_8bit = (colors * 255).astype(int).tolist()
+            for i, ring in enumerate(rings):
+                color = tuple(lut[i])
+                if engine == 'visvis':
+                    vv.plot(*ring, lc=color, mw=0, alpha=.2)
+                else:
+                    data.append(Scatter3d(
+                        x = ring[0],
+                        y = ring[1],
+                        z = ring[2],
+                        mode = 'lines',
+                        opacity = .3,
+                        line = dict(
+                            color = ("rgb(%s,%s,%s)" % tuple(lut_8bit[i])),
+                            width = 3)
+                    ))
+
+            for curve in curves:
+                if engine == 'visvis':
+                    vv.plot(*curve, lc='k', mw=0, lw=2)
+                else:
+                    data.append(Scatter3d(
+                    x = curve[0],
+                    y = curve[1],
+                    z = curve[2],
                     mode = 'lines',
-                    opacity = .3,
                     line = dict(
-                        color = ("rgb(%s,%s,%s)" % tuple([int(x*255) for x in color])),
-                        width = 3)
-                ))
-
-        curves = [curve[:iterations] for curve in self.curves]
-        for curve in curves:
-            if engine == 'visvis':
-                vv.plot(*curve, lc='k', mw=0, lw=2)
-            elif engine == 'pyplot':
-                ax.plot(*curve, c=(0, 0, 0, .8))
-            else:
-                data.append(Scatter3d(
-                x = curve[0],
-                y = curve[1],
-                z = curve[2],
-                mode = 'lines',
-                line = dict(
-                    color = ("rgb(0, 0, 0)"),
-                    width = 4)
-                ))
+                        color = ("rgb(0, 0, 0)"),
+                        width = 4)
+                    ))
 
         if engine == 'visvis':
             ax = vv.gca()